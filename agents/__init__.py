@@ -1,5 +1,19 @@
-from .relevance_checker import RelevanceChecker
-from .verification_agent import VerificationAgent
-from .research_agent import ResearchAgent
+import importlib
 
-__all__ = [RelevanceChecker, VerificationAgent, ResearchAgent]
\ No newline at end of file
+# Agents pull in google-genai and langgraph, so they are only imported on first access
+_EXPORTS = {
+    "RelevanceChecker": ".relevance_checker",
+    "VerificationAgent": ".verification_agent",
+    "ResearchAgent": ".research_agent",
+    "QueryRewriter": ".query_rewriter",
+    "ModelRouter": ".routing",
+}
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["RelevanceChecker", "VerificationAgent", "ResearchAgent", "QueryRewriter", "ModelRouter"]
@@ -0,0 +1,24 @@
+import re
+from typing import Iterable, Set
+
+# Function words and lecture boilerplate that say nothing about a chunk's topic.
+# Ordinals are deliberately absent: "the second example" must not match chunks about the first one.
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "been", "of", "in", "on", "to", "for",
+    "and", "or", "that", "this", "these", "those", "it", "its", "as", "at", "by", "with", "from",
+    "which", "can", "could", "also", "such", "into", "than", "then", "has", "have", "will",
+    "what", "how", "why", "when", "where", "who", "does", "do", "did", "about", "explain",
+    "tell", "me", "please", "say", "said", "lecture", "lecturer", "context", "according",
+}
+
+
+def content_terms(text: str, ignore: Iterable[str] = ()) -> Set[str]:
+    """Lowercased content words of `text`, with crude plural folding so "gradients" matches "gradient"."""
+    ignore = STOPWORDS.union(ignore)
+    terms = set()
+    for token in re.findall(r"[a-z0-9]+", text.lower()):
+        # Single digits stay: "rate of 3" and "rate of 5" must not look alike
+        if token in ignore or (len(token) < 2 and not token.isdigit()):
+            continue
+        terms.add(token[:-1] if len(token) > 3 and token.endswith("s") else token)
+    return terms
@@ -0,0 +1,107 @@
+import os
+import re
+from typing import List, Dict, Optional
+from langchain_core.documents import Document
+from google import genai
+from google.genai import types
+from config.settings import settings
+from retriever.time_index import UNIT, UNIT_END, mentions_time_range
+from .routing import ModelRouter
+from .lexical import content_terms
+
+FOLLOW_UP_MARKERS = {
+    "it", "its", "this", "that", "these", "those", "they", "them", "their",
+    "he", "she", "him", "her", "there", "above", "previous", "earlier",
+    "another", "other", "same", "also", "more", "else",
+}
+# Ordinals point back at earlier turns ("the second example") unless they scope a time range ("first 30 minutes")
+ORDINAL_MARKER_RE = re.compile(rf"\b(?:first|second|third|last|next)\b(?!\s+(?:\d+(?:\.\d+)?\s*)?(?:{UNIT}){UNIT_END})")
+FOLLOW_UP_PREFIXES = ("what about", "how about", "and ", "why ", "but ", "so ", "then ", "also ")
+
+
+def _terms(text: str) -> set:
+    # Pronouns and other back-references carry no topic of their own
+    return content_terms(text, ignore=FOLLOW_UP_MARKERS)
+
+
+class QueryRewriter:
+    def __init__(self, router: Optional[ModelRouter] = None):
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY environment variable not set")
+
+        self.client = genai.Client(api_key=api_key)
+        self.router = router or ModelRouter()
+
+        # Rewrites are a single sentence; the router keeps the output budget small
+        self.config = types.GenerateContentConfig(
+            temperature=0.0
+        )
+        print("Gemini Client for QueryRewriter initialized successfully.")
+
+    def is_follow_up(self, question: str) -> bool:
+        words = re.findall(r"[a-z']+", question.lower())
+        if not words:
+            return False
+        if question.lower().lstrip().startswith(FOLLOW_UP_PREFIXES):
+            return True
+        if not _terms(question):
+            return True
+        if ORDINAL_MARKER_RE.search(question.lower()):
+            return True
+        return any(word in FOLLOW_UP_MARKERS for word in words)
+
+    def generate_prompt(self, question: str, history: List[Dict]) -> str:
+        conversation = "\n".join(
+            f"{message['role'].capitalize()}: {message['content'][:300]}" for message in history
+        )
+        return f"""
+        You rewrite follow-up questions about a lecture into standalone questions.
+
+        **Instructions:**
+        - Use the conversation to resolve references like "it", "that" or "the second example".
+        - Keep the meaning of the follow-up; do not answer it.
+        - Respond with the standalone question only.
+
+        **Conversation:**
+        {conversation}
+
+        **Follow-up:** {question}
+
+        **Standalone question:**
+        """
+
+    def rewrite(self, question: str, history: List[Dict]) -> str:
+        """Turn a follow-up into a standalone query; standalone questions are returned unchanged."""
+        recent = [m for m in history if m.get("content")][-settings.REWRITE_HISTORY_TURNS:]
+        if not recent or not self.is_follow_up(question):
+            return question
+
+        try:
+            decision = self.router.route("rewrite", question)
+            response = self.router.generate(self.client, decision, self.generate_prompt(question, recent), self.config)
+            rewritten = (response.text or "").strip().strip('"')
+        except Exception as e:
+            print(f"Error during query rewrite: {e}")
+            return question
+
+        if not rewritten:
+            return question
+        print(f"Rewrote follow-up '{question}' -> '{rewritten}'")
+        return rewritten
+
+    def can_reuse_context(self, question: str, standalone: str, previous_docs: List[Document]) -> bool:
+        """True if the follow-up stays on the previous turn's topic, so its chunks can be reused as-is."""
+        if not previous_docs or not self.is_follow_up(question):
+            return False
+        # Time-scoped questions must go through the retriever so its time filter applies
+        if mentions_time_range(standalone) or mentions_time_range(question):
+            return False
+
+        query_terms = _terms(standalone)
+        if not query_terms:
+            return True
+
+        context_terms = _terms(" ".join(doc.page_content for doc in previous_docs))
+        coverage = len(query_terms & context_terms) / len(query_terms)
+        return coverage >= settings.CONTEXT_REUSE_THRESHOLD
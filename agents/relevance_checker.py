@@ -1,18 +1,22 @@
 import os
+from typing import List, Optional
+from langchain_core.documents import Document
 from google import genai
 from google.genai import types
 from config.settings import settings
+from .routing import ModelRouter
 
 class RelevanceChecker:
-    def __init__(self):
+    def __init__(self, router: Optional[ModelRouter] = None):
         api_key = os.getenv("GEMINI_API_KEY")
         if not api_key:
             raise ValueError("GEMINI_API_KEY environment variable not set")
 
         self.client = genai.Client(api_key=api_key)
+        self.router = router or ModelRouter()
         
+        # Output budget is set per call by the router
         self.config = types.GenerateContentConfig(
-            max_output_tokens=200,
             temperature=0.1,
             safety_settings=[
                 types.SafetySetting(
@@ -36,8 +40,9 @@ class RelevanceChecker:
         print("Gemini Client for RelevanceChecker initialized successfully.")
 
 
-    def check(self, question: str, retriever, k = 3) -> str:
-        top_docs = retriever.invoke(question)
+    def check(self, question: str, retriever, k = 3, documents: Optional[List[Document]] = None) -> str:
+        # Reuse documents the caller already retrieved instead of hitting the retriever again
+        top_docs = documents if documents is not None else retriever.invoke(question)
 
         if not top_docs:
             print("No documents returned. Classifying as NO_MATCH.")
@@ -61,11 +66,8 @@ class RelevanceChecker:
         """
 
         try:
-            response = self.client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=prompt,
-                config=self.config
-            )
+            decision = self.router.route("relevance", question)
+            response = self.router.generate(self.client, decision, prompt, self.config)
             
             if not response.text:
                  print("Warning: Model returned no content.")
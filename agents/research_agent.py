@@ -1,19 +1,21 @@
 import os
-from typing import List, Dict
+from typing import List, Dict, Optional
 from langchain_core.documents import Document
 from google import genai
 from google.genai import types
+from .routing import ModelRouter
 
 class ResearchAgent:
-    def __init__(self):
+    def __init__(self, router: Optional[ModelRouter] = None):
         api_key = os.getenv("GEMINI_API_KEY")
         if not api_key:
             raise ValueError("GEMINI_API_KEY environment variable not set")
         
         self.client = genai.Client(api_key=api_key)
+        self.router = router or ModelRouter()
         
+        # Model and output budget are chosen per call by the router
         self.config = types.GenerateContentConfig(
-            max_output_tokens=512,
             temperature=0.4,
             safety_settings=[
                 types.SafetySetting(
@@ -39,14 +41,19 @@ class ResearchAgent:
     def sanitize_response(self, response_text: str) -> str:
         return response_text.strip()
     
-    def generate_prompt(self, question: str, context: str) -> str:
+    def generate_prompt(self, question: str, context: str, brief: bool = False) -> str:
+        length = (
+            "Answer in a few sentences; the answer must fit in a short reply."
+            if brief else
+            "Return as much information as you can get from the context."
+        )
         return f"""
         You are an AI assistant designed to provide precise and factual answers based on the given context.
 
         **Instructions:**
         - Answer the following question using only the provided context.
         - Be clear, concise, and factual.
-        - Return as much information as you can get from the context.
+        - {length}
         
         **Question:** {question}
         **Context:**
@@ -55,16 +62,14 @@ class ResearchAgent:
         **Provide your answer below:**
         """
     
-    def generate(self, question: str, documents: List[Document]) -> Dict:
+    def generate(self, question: str, documents: List[Document], relevance: Optional[str] = None,
+                 escalate: bool = False) -> Dict:
         context = "\n".join([doc.page_content for doc in documents])
-        prompt = self.generate_prompt(question, context)
+        decision = self.router.route("research", question, documents, relevance=relevance, escalate=escalate)
+        prompt = self.generate_prompt(question, context, brief=decision.brief)
         
         try:
-            response = self.client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=prompt,
-                config=self.config
-            )
+            response = self.router.generate(self.client, decision, prompt, self.config)
             generated_text = response.text 
             print("LLM response received.")
 
@@ -72,8 +77,15 @@ class ResearchAgent:
             print(f"Error during model inference: {e}")
             raise RuntimeError("Failed to generate answer due to a model error.") from e
 
+        # Still cut off after the router's retry with a larger budget; the UI flags it, the draft stays as-is
+        truncated = self.router.hit_token_limit(response)
+        if truncated and not generated_text:
+            raise RuntimeError("The model ran out of output tokens before producing an answer.")
+
         sanitized_answer = self.sanitize_response(generated_text) if generated_text else "I cannot generate an answer."
         return {
             "answer": sanitized_answer,
-            "source_documents": documents
+            "source_documents": documents,
+            "model": decision.model,
+            "truncated": truncated
         }
\ No newline at end of file
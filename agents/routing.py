@@ -0,0 +1,131 @@
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional
+from langchain_core.documents import Document
+from google.genai import types
+from config.settings import settings
+
+COMPLEX_CUES = re.compile(
+    r"\b(why|how (?:does|do|did|is|are|can)|compare|comparison|difference|differences|explain|derive|"
+    r"relationship|trade-?offs?|versus|vs|steps|walk through|prove|advantages|disadvantages)\b"
+)
+
+
+@dataclass
+class RouteDecision:
+    stage: str
+    tier: str
+    model: str
+    max_output_tokens: int  # budget for the visible answer; thinking is added on top
+    thinking_budget: int
+    reason: str
+    brief: bool = False
+
+
+class ModelRouter:
+    def __init__(self):
+        """Picks a model tier and output budget per call, and records latency per tier."""
+        self.decisions = deque(maxlen=settings.ROUTING_LOG_SIZE)
+        self._stats: Dict[str, Dict[str, float]] = defaultdict(lambda: {"calls": 0, "total_latency": 0.0})
+        self._lock = threading.Lock()
+
+    def complexity(self, question: str) -> float:
+        """Rough 0-1 score: long, multi-part or explanatory questions need more room to answer."""
+        text = question.lower()
+        score = min(len(text.split()) / 40, 0.5)
+        score += 0.25 * min(len(COMPLEX_CUES.findall(text)), 2)
+        score += 0.1 * max(text.count("?") - 1, 0)
+        return min(score, 1.0)
+
+    def _fast(self, stage: str, max_output_tokens: int, reason: str, thinking_budget: int = 0,
+              brief: bool = False) -> RouteDecision:
+        return RouteDecision(stage, "fast", settings.FAST_MODEL, max_output_tokens, thinking_budget, reason, brief)
+
+    def route(self, stage: str, question: str = "", documents: Optional[List[Document]] = None,
+              relevance: Optional[str] = None, escalate: bool = False) -> RouteDecision:
+        if stage == "relevance":
+            decision = self._fast(stage, settings.RELEVANCE_MAX_TOKENS, "single label")
+        elif stage == "rewrite":
+            decision = self._fast(stage, settings.REWRITE_MAX_TOKENS, "single sentence")
+        elif stage == "verify":
+            decision = self._fast(stage, settings.VERIFY_MAX_TOKENS, "structured report")
+        elif escalate:
+            # The strong model always thinks, so give it an explicit bounded budget
+            decision = RouteDecision(stage, "strong", settings.STRONG_MODEL, settings.RESEARCH_MAX_TOKENS_LONG,
+                                     settings.STRONG_THINKING_BUDGET, "previous draft failed verification")
+        else:
+            complexity = self.complexity(question)
+            low_confidence = relevance == "PARTIAL" or len(documents or []) < 2
+            if complexity >= settings.COMPLEXITY_THRESHOLD or low_confidence:
+                # Let the fast model think when the question is involved or the context is thin
+                reason = f"complexity={complexity:.2f}, relevance={relevance or 'unknown'}"
+                decision = self._fast(stage, settings.RESEARCH_MAX_TOKENS_LONG, reason,
+                                      thinking_budget=settings.RESEARCH_THINKING_BUDGET)
+            else:
+                decision = self._fast(stage, settings.RESEARCH_MAX_TOKENS_SHORT, f"complexity={complexity:.2f}",
+                                      brief=True)
+
+        print(f"Routing {stage} -> {decision.model} ({decision.tier}, {decision.max_output_tokens} answer + "
+              f"{decision.thinking_budget} thinking tokens): {decision.reason}")
+        return decision
+
+    def config_for(self, base_config: types.GenerateContentConfig, decision: RouteDecision) -> types.GenerateContentConfig:
+        # Gemini 2.5 counts thinking against max_output_tokens, so reserve it on top of the answer budget
+        return base_config.model_copy(update={
+            "max_output_tokens": decision.max_output_tokens + decision.thinking_budget,
+            "thinking_config": types.ThinkingConfig(thinking_budget=decision.thinking_budget),
+        })
+
+    @staticmethod
+    def hit_token_limit(response) -> bool:
+        candidates = getattr(response, "candidates", None) or []
+        return bool(candidates) and candidates[0].finish_reason == types.FinishReason.MAX_TOKENS
+
+    def generate(self, client, decision: RouteDecision, contents: str, base_config: types.GenerateContentConfig):
+        """Call Gemini with the routed model and budget, recording the latency under the decision's tier.
+
+        A response cut off at the token limit is retried with a doubled answer budget.
+        """
+        for attempt in range(settings.MAX_TOKENS_RETRIES + 1):
+            started = time.perf_counter()
+            try:
+                response = client.models.generate_content(
+                    model=decision.model,
+                    contents=contents,
+                    config=self.config_for(base_config, decision)
+                )
+            finally:
+                self.record(decision, time.perf_counter() - started)
+
+            if not self.hit_token_limit(response) or attempt == settings.MAX_TOKENS_RETRIES:
+                return response
+            print(f"{decision.stage} response hit the {decision.max_output_tokens}-token limit. Retrying with more room.")
+            decision = replace(decision, max_output_tokens=decision.max_output_tokens * 2)
+        return response
+
+    def record(self, decision: RouteDecision, latency: float):
+        with self._lock:
+            stats = self._stats[decision.tier]
+            stats["calls"] += 1
+            stats["total_latency"] += latency
+            self.decisions.append({
+                "stage": decision.stage,
+                "tier": decision.tier,
+                "model": decision.model,
+                "max_output_tokens": decision.max_output_tokens,
+                "reason": decision.reason,
+                "latency": latency,
+            })
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                tier: {
+                    "calls": stats["calls"],
+                    "mean_latency": stats["total_latency"] / stats["calls"] if stats["calls"] else 0.0,
+                }
+                for tier, stats in self._stats.items()
+            }
@@ -1,20 +1,50 @@
 import os
-from typing import List, Dict
+import re
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
 from langchain_core.documents import Document
 from google import genai
 from google.genai import types
+from .routing import ModelRouter
+from .lexical import content_terms
+from config.settings import settings
+
+VERDICTS = ("SUPPORTED", "UNSUPPORTED", "CONTRADICTED")
+# Word overlap can't tell "does use" from "does not use", or 3 from 5, so these always go to Gemini
+NEGATION_RE = re.compile(r"\b(?:not|no|never|none|nor|cannot)\b|n't\b", re.IGNORECASE)
+NUMBER_RE = re.compile(r"\d")
+
+CLAIM_SCHEMA = types.Schema(
+    type=types.Type.OBJECT,
+    properties={
+        "verdict": types.Schema(type=types.Type.STRING, enum=list(VERDICTS)),
+        "explanation": types.Schema(type=types.Type.STRING),
+    },
+    required=["verdict", "explanation"],
+)
+
+RELEVANCE_SCHEMA = types.Schema(
+    type=types.Type.OBJECT,
+    properties={"relevant": types.Schema(type=types.Type.STRING, enum=["YES", "NO"])},
+    required=["relevant"],
+)
+
 
 class VerificationAgent:
-    def __init__(self):
+    def __init__(self, router: Optional[ModelRouter] = None):
         api_key = os.getenv("GEMINI_API_KEY")
         if not api_key:
             raise ValueError("GEMINI_API_KEY environment variable not set")
         
         self.client = genai.Client(api_key=api_key)
+        self.router = router or ModelRouter()
 
+        # Output budget is set per call by the router; verdicts come back as JSON
         self.config = types.GenerateContentConfig(
-            max_output_tokens=512,
-            temperature=0.4,
+            temperature=0.0,
+            response_mime_type="application/json",
+            response_schema=CLAIM_SCHEMA,
             safety_settings=[
                 types.SafetySetting(
                     category="HARM_CATEGORY_HARASSMENT",
@@ -34,98 +64,173 @@ class VerificationAgent:
                 )
             ]
         )
+        self.relevance_config = self.config.model_copy(update={"response_schema": RELEVANCE_SCHEMA})
         print("Gemini Client for VerificationAgent initialized successfully.")
 
     def sanitize_response(self, response_text: str) -> str:
         return response_text.strip()
-    
-    def generate_prompt(self, answer: str, context: str) -> str:
+
+    def split_claims(self, answer: str) -> List[str]:
+        """Split a draft into sentence-level claims, dropping headings and fragments."""
+        claims = []
+        for line in answer.splitlines():
+            line = re.sub(r"^\s*(?:[-*•]|\d+[.)])\s*", "", line).replace("*", "").strip()
+            for sentence in re.split(r"(?<=[.!?])\s+", line):
+                sentence = sentence.strip()
+                if len(sentence.split()) >= settings.CLAIM_MIN_WORDS:
+                    claims.append(sentence)
+        return claims
+
+    def can_match_locally(self, claim: str) -> bool:
+        return (len(content_terms(claim)) >= settings.CLAIM_MIN_TERMS
+                and not NEGATION_RE.search(claim) and not NUMBER_RE.search(claim))
+
+    def match_claim(self, claim: str, doc_terms: List[set]) -> List[Tuple[float, int]]:
+        """Rank chunks by the share of the claim's content words they contain."""
+        claim_terms = content_terms(claim)
+        if not claim_terms:
+            return []
+        scores = [(len(claim_terms & terms) / len(claim_terms), i) for i, terms in enumerate(doc_terms)]
+        return sorted(scores, reverse=True)
+
+    def generate_prompt(self, claim: str, context: str) -> str:
         return f"""
-        You are an AI assistant designed to verify the accuracy and relevance of answers based on provided context.
+        You are an AI assistant that checks a single claim against lecture excerpts.
 
         **Instructions:**
-        - Verify the following answer against the provided context.
-        - Check for:
-        1. Direct/indirect factual support (YES/NO)
-        2. Unsupported claims (list any if present)
-        3. Contradictions (list any if present)
-        4. Relevance to the question (YES/NO)
-        - Provide additional details or explanations where relevant.
-        - Respond in the exact format specified below without adding any unrelated information.
-
-        **Format:**
-        Supported: YES/NO
-        Unsupported Claims: [item1, item2, ...]
-        Contradictions: [item1, item2, ...]
-        Relevant: YES/NO
-        Additional Details: [Any extra information or explanations]
+        - SUPPORTED: the excerpts state or directly imply the claim.
+        - CONTRADICTED: the excerpts state something incompatible with the claim.
+        - UNSUPPORTED: otherwise.
+        - Keep the explanation to one short sentence.
 
-        **Answer:** {answer}
-        **Context:**
+        **Claim:** {claim}
+        **Excerpts:**
         {context}
+        """
+
+    def generate_relevance_prompt(self, question: str, answer: str) -> str:
+        return f"""
+        You are an AI assistant that checks whether an answer addresses the question asked.
+
+        **Instructions:**
+        - YES: the answer responds to what the question asks, even if only in part.
+        - NO: the answer is about something else or does not respond to the question.
 
-        **Respond ONLY with the above format.**
+        **Question:** {question}
+        **Answer:** {answer}
         """
 
-    def parse_verification_response(self, response_text: str) -> Dict:
+    def check_relevance(self, question: str, answer: str) -> str:
+        decision = self.router.route("verify", question)
         try:
-            lines = response_text.strip().split("\n")
-            result = {
-                "Supported": "NO",
-                "Unsupported Claims": [],
-                "Contradictions": [],
-                "Relevant": "NO",
-                "Additional Details": []
-            }
-
-            current_key = None
-            for line in lines:
-                line = line.strip()
-                if line.startswith("Supported:"):
-                    result["Supported"] = line.split(":", 1)[1].strip()
-                elif line.startswith("Unsupported Claims:"):
-                    current_key = "Unsupported Claims"
-                elif line.startswith("Contradictions:"):
-                    current_key = "Contradictions"
-                elif line.startswith("Relevant:"):
-                    result["Relevant"] = line.split(":", 1)[1].strip()
-                elif line.startswith("Additional Details:"):
-                    current_key = "Additional Details"
-                elif current_key:
-                    result[current_key].append(line)
-            return result
+            response = self.router.generate(
+                self.client, decision, self.generate_relevance_prompt(question, answer), self.relevance_config
+            )
+            label = str(json.loads(self.sanitize_response(response.text or ""))["relevant"]).upper()
+            if label not in ("YES", "NO"):
+                raise ValueError(f"unexpected relevance {label!r}")
+            return label
         except Exception as e:
-            print(f"Error parsing verification response: {e}")
-            return None
-        
+            print(f"Error checking answer relevance: {e}")
+            return "UNVERIFIED"
+
+    def check_claim(self, claim: str, candidates: List[Document]) -> Dict:
+        context = "\n\n".join(doc.page_content for doc in candidates)
+        decision = self.router.route("verify", claim)
+        try:
+            response = self.router.generate(self.client, decision, self.generate_prompt(claim, context), self.config)
+            verdict = json.loads(self.sanitize_response(response.text or ""))
+            label = str(verdict["verdict"]).upper()
+            if label not in VERDICTS:
+                raise ValueError(f"unexpected verdict {label!r}")
+            return {"verdict": label, "explanation": verdict.get("explanation", "")}
+        except Exception as e:
+            print(f"Error verifying claim '{claim}': {e}")
+            return {"verdict": "UNVERIFIED", "explanation": str(e)}
+
+    def verify(self, question: str, answer: str, context_docs: List[Document]) -> Optional[Dict]:
+        """Verify a draft claim by claim, and check that it answers the question.
+
+        Claims with no negation or numbers whose words are all found in one chunk are accepted
+        locally; the rest go to Gemini, concurrently, each with its best-matching chunks.
+        """
+        claims = self.split_claims(answer)
+        if not claims:
+            # Terse answers ("Backpropagation.") have no sentence-sized claims; check them whole
+            if not answer.strip():
+                return None
+            claims = [answer.strip()]
+
+        doc_terms = [content_terms(doc.page_content) for doc in context_docs]
+        results: List[Optional[Dict]] = [None] * len(claims)
+        pending = []
+
+        for i, claim in enumerate(claims):
+            ranked = self.match_claim(claim, doc_terms)
+            if ranked and ranked[0][0] == 1.0 and self.can_match_locally(claim):
+                results[i] = {"verdict": "SUPPORTED", "explanation": "lexical match", "chunk": context_docs[ranked[0][1]]}
+            else:
+                candidates = [context_docs[idx] for _, idx in ranked[:settings.CLAIM_CONTEXT_CHUNKS]] or context_docs
+                pending.append((i, claim, candidates))
+
+        print(f"Verifying {len(claims)} claims: {len(claims) - len(pending)} matched locally, {len(pending)} sent to Gemini.")
+        # The relevance check runs alongside the claim checks
+        with ThreadPoolExecutor(max_workers=min(len(pending) + 1, settings.VERIFY_MAX_CONCURRENCY)) as pool:
+            relevance = pool.submit(self.check_relevance, question, answer)
+            verdicts = pool.map(lambda item: self.check_claim(item[1], item[2]), pending)
+            for (i, _, candidates), verdict in zip(pending, verdicts):
+                results[i] = dict(verdict, chunk=candidates[0] if candidates else None)
+            relevant = relevance.result()
+
+        unsupported = [c for c, r in zip(claims, results) if r["verdict"] == "UNSUPPORTED"]
+        contradictions = [c for c, r in zip(claims, results) if r["verdict"] == "CONTRADICTED"]
+        # A claim whose check failed (API error, bad JSON) is not evidence of support
+        unverified = [c for c, r in zip(claims, results) if r["verdict"] == "UNVERIFIED"]
+        details = [
+            f"{claim} -> {r['verdict']} ({r['explanation']}"
+            + (f", chunk at {r['chunk'].metadata.get('start')}s)" if r.get("chunk") else ")")
+            for claim, r in zip(claims, results)
+        ]
+
+        return {
+            "Supported": "NO" if unsupported or contradictions or unverified else "YES",
+            "Unsupported Claims": unsupported,
+            "Contradictions": contradictions,
+            "Unverified Claims": unverified,
+            "Relevant": relevant,
+            "Additional Details": details,
+            "Claims": [dict(r, claim=c) for c, r in zip(claims, results)]
+        }
+
     def format_verification_report(self, verification: Dict) -> str:
         if not verification:
             return "Error: Unable to generate verification report."
 
-        report = (
-            f"The answer is {'supported' if verification['Supported'] == 'YES' else 'not supported'} by the context. "
-            f"It is {'relevant' if verification['Relevant'] == 'YES' else 'not relevant'} to the question. "
-        )
+        report = f"The answer is {'supported' if verification['Supported'] == 'YES' else 'not supported'} by the context. "
+        if verification['Relevant'] == 'UNVERIFIED':
+            report += "Its relevance to the question could not be checked. "
+        else:
+            report += f"It is {'relevant' if verification['Relevant'] == 'YES' else 'not relevant'} to the question. "
 
         if verification['Unsupported Claims']:
             unsupported = ', '.join(verification['Unsupported Claims'])
             report += f"Unsupported claims include: {unsupported}. "
 
+        if verification['Contradictions']:
+            contradictions = ', '.join(verification['Contradictions'])
+            report += f"Contradicted claims include: {contradictions}. "
+
+        if verification.get('Unverified Claims'):
+            unverified = ', '.join(verification['Unverified Claims'])
+            report += f"Claims that could not be checked: {unverified}. "
+
         return report.strip()
 
-    def check(self, answer: str, context_docs: List[Document]) -> str:
-        context = "\n\n".join([doc.page_content for doc in context_docs])
-        prompt = self.generate_prompt(answer, context)
+    def is_verified(self, verification: Optional[Dict]) -> bool:
+        if not verification:
+            return False
+        return (verification["Supported"].upper().startswith("YES")
+                and verification["Relevant"].upper().startswith("YES"))
 
-        # NEW CALL SYNTAX
-        response = self.client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt,
-            config=self.config
-        )
-        
-        sanitized_response = self.sanitize_response(response.text)
-        verification = self.parse_verification_response(sanitized_response)
-        report = self.format_verification_report(verification)
-        
-        return report
\ No newline at end of file
+    def check(self, question: str, answer: str, context_docs: List[Document]) -> str:
+        return self.format_verification_report(self.verify(question, answer, context_docs))
\ No newline at end of file
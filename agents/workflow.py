@@ -3,7 +3,10 @@ from typing import TypedDict, List, Dict, Any
 from .research_agent import ResearchAgent
 from .verification_agent import VerificationAgent
 from .relevance_checker import RelevanceChecker
+from .query_rewriter import QueryRewriter
+from .routing import ModelRouter
 from langchain_core.documents import Document
+from config.settings import settings
 
 # NOTE: The 'EnsembleRetriever' import has been removed to fix your error.
 # We now use 'Any' for the retriever type hint.
@@ -14,15 +17,21 @@ class AgentState(TypedDict):
     draft_answer: str
     verification_report: str
     is_relevant: bool
+    relevance: str
+    research_attempts: int
+    truncated: bool
+    verification_passed: bool
     retriever: Any # Using Any avoids the import error
 
 
 class AgentWorkflow: 
     
     def __init__(self):
-        self.researcher = ResearchAgent()
-        self.verifier = VerificationAgent()
-        self.relevance_checker = RelevanceChecker()
+        self.router = ModelRouter()
+        self.researcher = ResearchAgent(self.router)
+        self.verifier = VerificationAgent(self.router)
+        self.relevance_checker = RelevanceChecker(self.router)
+        self.query_rewriter = QueryRewriter(self.router)
         
     
     def create_workflow(self):
@@ -39,33 +48,57 @@ class AgentWorkflow:
         workflow.add_conditional_edges("check_relevance", self.after_relevance, {"re_research": "research", "irrelevant": END}) 
 
         return workflow.compile()
+
+    def warm_up(self):
+        """Open each agent's Gemini connection with a cheap metadata call before the first question."""
+        for agent in (self.relevance_checker, self.researcher, self.verifier, self.query_rewriter):
+            try:
+                agent.client.models.get(model=settings.FAST_MODEL)
+            except Exception as e:
+                print(f"Warm-up failed for {type(agent).__name__}: {e}")
     
 
     def research_step(self, state: AgentState) -> AgentState:
         print(f"Research step initiated with question: {state['question']}")
-        result = self.researcher.generate(state['question'], state['documents'])
-        return {"draft_answer": result['answer']}
+        attempts = state.get('research_attempts', 0)
+        # Only a draft that already failed verification is retried on the stronger model
+        result = self.researcher.generate(
+            state['question'], state['documents'], relevance=state.get('relevance'), escalate=attempts > 0
+        )
+        return {"draft_answer": result['answer'], "research_attempts": attempts + 1, "truncated": result['truncated']}
 
 
     def verifier_step(self, state: AgentState) -> AgentState:
         print(f"Verification step initiated with draft answer: {state['draft_answer']}")
-        result = self.verifier.check(state['draft_answer'], state['documents'])
-        return {"verification_report": result}
+        answer = state['draft_answer']
+        if state.get('truncated'):
+            # Don't verify the sentence the output limit cut in half
+            cut = max(answer.rfind(mark) for mark in ".!?\n")
+            if cut > 0:
+                answer = answer[:cut + 1]
+        verification = self.verifier.verify(state['question'], answer, state['documents'])
+        return {
+            "verification_report": self.verifier.format_verification_report(verification),
+            "verification_passed": self.verifier.is_verified(verification)
+        }
 
 
     def relevance_checker_step(self, state: AgentState) -> AgentState:
         retriever = state['retriever']
-        classification = self.relevance_checker.check(question = state['question'], retriever=retriever, k = 5)
+        classification = self.relevance_checker.check(
+            question = state['question'], retriever=retriever, k = 5, documents=state.get('documents')
+        )
         
         if classification == "CAN_ANSWER":
-            return {"is_relevant": True}
+            return {"is_relevant": True, "relevance": classification}
 
         elif classification == "PARTIAL":
-            return {"is_relevant": True}
+            return {"is_relevant": True, "relevance": classification}
         
         else:
             return {
                 "is_relevant": False,
+                "relevance": classification,
                 "draft_answer": "This question isn't related to the lecture content (or no data was found)."
             }
 
@@ -79,7 +112,7 @@ class AgentWorkflow:
         report = state.get('verification_report', "")
         print(f"After verification: {report}")
         
-        if "Supported: NO" in report or "Relevant: NO" in report:
+        if not state.get('verification_passed') and state.get('research_attempts', 0) < settings.MAX_RESEARCH_ATTEMPTS:
             return "re_research"
         else:
             return "end"
\ No newline at end of file
@@ -1,64 +1,46 @@
 import streamlit as st
-import json
 import os
+import time
+import uuid
 from dotenv import load_dotenv
-from typing import List
-from langchain_core.documents import Document
 
-# Internal Modules
-from agents.workflow import AgentWorkflow
-from retriever.retrieval import RetrieverBuilder
+# Internal Modules (heavy dependencies are imported lazily by the loader thread)
+from chat import ChatHistory
 from config.settings import settings
+from startup import SystemLoader
 
 # env variables
 load_dotenv()
 
 st.set_page_config(page_title="Lecture RAG Assistant", layout="wide")
 
+TRUNCATED_NOTICE = "Answer truncated at the output limit."
 
-@st.cache_resource
-def load_and_process_data(json_path: str) -> List[Document]:
-    """
-    Loads lecture.json and converts it into LangChain Documents.
-    Combines transcript and slide text for better retrieval context.
-    """
-    if not os.path.exists(json_path):
-        return []
-
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    documents = []
-    for chunk in data:
-        content = f"Transcript: {chunk['transcript']}\nSlide Content: {chunk['slide_text']}"
-        
-        metadata = {
-            "start": chunk['start'],
-            "end": chunk['end'],
-            "slide_image": chunk['slide_image']
-        }
-        
-        doc = Document(page_content=content, metadata=metadata)
-        documents.append(doc)
-    
-    return documents
 
 @st.cache_resource
-def initialize_system(json_path: str):
+def get_system_loader(json_path: str) -> SystemLoader:
     """
-    Initializes the Vector DB (Chroma) and the Agent Workflow.
-    Cached to prevent reloading on every interaction.
+    Starts building the retriever, agents and slide assets in the background.
+    Cached so the loader runs once per process and every session shares it.
     """
-    docs = load_and_process_data(json_path)
-    if not docs:
-        return None, None
+    return SystemLoader(json_path).start()
 
-    retriever_builder = RetrieverBuilder()
-    retriever = retriever_builder.build_hybrid_retriever(docs) # if bm25 fails, falls back to vector only
 
-    workflow_agent = AgentWorkflow()
-    
-    return retriever, workflow_agent
+def render_message(message: dict):
+    with st.chat_message(message["role"]):
+        st.markdown(message["content"])
+        if message.get("truncated"):
+            st.caption(TRUNCATED_NOTICE)
+        if "image" in message:
+            thumbnail = asset_cache.get_thumbnail(message["image"])
+            if thumbnail:
+                st.image(thumbnail, caption=f"Slide at {message['timestamp']}s", width=400)
+        # Debug chunks are only resolved from the chunk store once the panel is opened
+        if message.get("chunk_ids"):
+            if st.toggle("Retrieved Context (Debug)", key=f"debug_{message['seq']}"):
+                for i, doc in enumerate(chunk_store.get_many(message["chunk_ids"])):
+                    st.markdown(f"**Chunk {i+1} (Time: {doc.metadata.get('start')}s):**")
+                    st.text(doc.page_content)
 
 # Streamlit Interface 
 
@@ -81,33 +63,71 @@ with st.sidebar:
         st.error(f"❌ {json_file} not found. Please run pre_process.py first.")
         st.stop()
         
-    st.info("Loading system... (this may take a moment)")
-    retriever, workflow_agent = initialize_system(json_file)
-    if retriever:
-        st.success("System Ready!")
-    else:
-        st.error("Failed to initialize system.")
+    loader = get_system_loader(json_file)
+    if loader.ready:
+        st.success(f"System Ready! (cold start {loader.cold_start_seconds:.1f}s)")
+        with st.expander("Startup timings"):
+            for stage, seconds in loader.timings.items():
+                st.text(f"{stage}: {seconds:.2f}s")
+    elif loader.failed:
+        st.error(f"Failed to initialize system: {loader.error}")
+        # Drop the failed loader so a transient error (e.g. Ollama still starting) can be retried
+        get_system_loader.clear()
+        if st.button("Retry"):
+            st.rerun()
         st.stop()
+    else:
+        st.info(f"Loading system... ({loader.stage or 'starting'})")
 
-if "messages" not in st.session_state:
-    st.session_state.messages = []
+if not loader.ready:
+    # Keep the page interactive and poll until the background loader finishes
+    st.chat_input("Loading lecture index...", disabled=True)
+    time.sleep(0.5)
+    st.rerun()
 
-for message in st.session_state.messages:
-    with st.chat_message(message["role"]):
-        st.markdown(message["content"])
-        if "image" in message:
-            st.image(message["image"], caption=f"Slide at {message['timestamp']}s", width=400)
-        # Show debug info if available in history
-        if "debug_docs" in message:
-            with st.expander("Retrieved Context (Debug)"):
-                for i, doc in enumerate(message["debug_docs"]):
-                    st.markdown(f"**Chunk {i+1} (Time: {doc.metadata.get('start')}s):**")
-                    st.text(doc.page_content)
+retriever = loader.retriever
+workflow_agent = loader.workflow_agent
+workflow_graph = loader.workflow_graph
+asset_cache = loader.asset_cache
+chunk_store = loader.chunk_store
+
+with st.sidebar:
+    routing = workflow_agent.router.summary()
+    if routing:
+        with st.expander("Model routing"):
+            for tier, stats in routing.items():
+                st.text(f"{tier}: {stats['calls']} calls, {stats['mean_latency']:.2f}s avg")
+
+if "history" not in st.session_state:
+    st.session_state.history = ChatHistory(session_id=uuid.uuid4().hex)
+history = st.session_state.history
+
+with st.sidebar:
+    if st.button("Clear conversation"):
+        history.clear()
+        st.session_state.pop("archive_pages", None)
+        st.rerun()
+
+# Older turns live in SQLite and are only loaded on request, one page at a time
+paged_out = history.paged_out_count()
+if paged_out:
+    page_size = settings.CHAT_HISTORY_PAGE_SIZE
+    if st.toggle(f"Show earlier messages ({paged_out} archived)", key="show_earlier"):
+        pages = st.session_state.setdefault("archive_pages", 1)
+        if pages * page_size < paged_out and st.button("Load older messages"):
+            pages = st.session_state.archive_pages = pages + 1
+        # Oldest page first so the conversation reads top to bottom
+        for page in reversed(range(pages)):
+            for message in history.load_earlier(page_size, offset=page * page_size):
+                render_message(message)
+
+for message in history.messages:
+    render_message(message)
 
 
 if prompt := st.chat_input("What did the lecturer say about...?"):
     
-    st.session_state.messages.append({"role": "user", "content": prompt})
+    history.append({"role": "user", "content": prompt})
     with st.chat_message("user"):
         st.markdown(prompt)
 
@@ -116,16 +136,29 @@ if prompt := st.chat_input("What did the lecturer say about...?"):
         message_placeholder.markdown("*Thinking... (Researching & Verifying)*")
         
         try:
-            workflow_graph = workflow_agent.create_workflow()
-            
-            debug_docs = retriever.invoke(prompt) 
+            # Resolve follow-ups against recent turns before retrieving
+            earlier_turns = history.messages[:-1]
+            question = workflow_agent.query_rewriter.rewrite(prompt, earlier_turns)
+
+            previous_turn = next((m for m in reversed(earlier_turns) if m.get("chunk_ids")), None)
+            previous_docs = chunk_store.get_many(previous_turn["chunk_ids"]) if previous_turn else []
+
+            if workflow_agent.query_rewriter.can_reuse_context(prompt, question, previous_docs):
+                print("Follow-up on the same topic. Reusing previous turn's chunks.")
+                debug_docs = previous_docs
+            else:
+                debug_docs = retriever.invoke(question)
             
             initial_state = {
-                "question": prompt,
+                "question": question,
                 "documents": debug_docs, # Pass retrieved docs directly to state
                 "draft_answer": "",
                 "verification_report": "",
                 "is_relevant": False,
+                "relevance": "",
+                "research_attempts": 0,
+                "truncated": False,
+                "verification_passed": False,
                 "retriever": retriever
             }
             
@@ -143,9 +176,13 @@ if prompt := st.chat_input("What did the lecturer say about...?"):
 
 
             message_placeholder.markdown(answer)
+            truncated = final_state.get("truncated", False)
+            if truncated:
+                st.caption(TRUNCATED_NOTICE)
             
-            if top_image and os.path.exists(top_image):
-                st.image(top_image, caption=f"Reference Slide (Time: {timestamp}s)", width=500)
+            thumbnail = asset_cache.get_thumbnail(top_image)
+            if thumbnail:
+                st.image(thumbnail, caption=f"Reference Slide (Time: {timestamp}s)", width=500)
             
             # Show debug expander
             with st.expander("Retrieved Context (Debug)"):
@@ -158,13 +195,14 @@ if prompt := st.chat_input("What did the lecturer say about...?"):
             history_entry = {
                 "role": "assistant", 
                 "content": answer,
-                "debug_docs": debug_docs # Save for history view
+                "chunk_ids": chunk_store.ids_for(debug_docs), # Resolved on demand in history view
+                "truncated": truncated
             }
             if top_image:
                 history_entry["image"] = top_image
                 history_entry["timestamp"] = timestamp
             
-            st.session_state.messages.append(history_entry)
+            history.append(history_entry)
 
         except Exception as e:
             message_placeholder.error(f"An error occurred: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,3 @@
+from .thumbnails import SlideAssetCache
+
+__all__ = ["SlideAssetCache"]
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, List, Optional
+
+from langchain_core.documents import Document
+from config.settings import settings
+
+# Slides are compared on a small grayscale grid so re-encoded frames of the same slide still match
+SIGNATURE_SIZE = (64, 36)
+MANIFEST_FILE = "manifest.json"
+
+
+class SlideAssetCache:
+    def __init__(self, thumbnail_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        """Serve downscaled WebP slide thumbnails from an in-memory LRU bounded by a byte budget."""
+        self.thumbnail_dir = thumbnail_dir or settings.THUMBNAIL_DIR
+        self.max_bytes = max_bytes if max_bytes is not None else settings.THUMBNAIL_CACHE_BYTES
+        os.makedirs(self.thumbnail_dir, exist_ok=True)
+
+        self._thumbnails: Dict[str, str] = {}  # slide image path -> thumbnail path
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._cache_size = 0
+        self._lock = Lock()
+
+    def build_thumbnails(self, docs: List[Document]) -> None:
+        """Precompute thumbnails for every chunk's slide, reusing the previous one when the slide hasn't changed.
+
+        Results are recorded in a manifest, so slides whose source file and thumbnail settings
+        are unchanged are not decoded again on the next start.
+        """
+        from PIL import Image
+
+        manifest = self._load_manifest()
+        settings_key = self._settings_key()
+        built, reused, cached = 0, 0, 0
+        prev_source, prev_signature, prev_thumbnail = None, None, None
+
+        for doc in docs:
+            source = doc.metadata.get("slide_image")
+            if not source or source in self._thumbnails:
+                continue
+            if not os.path.exists(source):
+                prev_source, prev_signature, prev_thumbnail = None, None, None
+                continue
+
+            stat = os.stat(source)
+            entry = manifest.get(source)
+            if (entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size
+                    and entry["settings"] == settings_key and os.path.exists(entry["thumbnail"])):
+                self._thumbnails[source] = entry["thumbnail"]
+                cached += 1
+                # Only decoded if the next slide is new and has to be compared against this one
+                prev_source, prev_signature, prev_thumbnail = source, None, entry["thumbnail"]
+                continue
+
+            if prev_thumbnail and prev_signature is None:
+                try:
+                    with Image.open(prev_source) as prev_img:
+                        prev_signature = self._signature(prev_img)
+                except Exception:
+                    prev_thumbnail = None
+
+            try:
+                with Image.open(source) as img:
+                    signature = self._signature(img)
+                    if prev_thumbnail and self._same_slide(signature, prev_signature):
+                        thumbnail = prev_thumbnail
+                        reused += 1
+                    else:
+                        thumbnail = os.path.join(self.thumbnail_dir, f"{self._file_hash(source)}_{settings_key}.webp")
+                        if not os.path.exists(thumbnail):
+                            self._write_thumbnail(img, thumbnail)
+                            built += 1
+            except Exception as e:
+                print(f"Could not build thumbnail for {source}: {e}")
+                prev_source, prev_signature, prev_thumbnail = None, None, None
+                continue
+
+            self._thumbnails[source] = thumbnail
+            manifest[source] = {
+                "mtime": stat.st_mtime,
+                "size": stat.st_size,
+                "settings": settings_key,
+                "thumbnail": thumbnail,
+            }
+            if thumbnail != prev_thumbnail:
+                prev_signature = signature
+            prev_source, prev_thumbnail = source, thumbnail
+
+        if built or reused:
+            self._save_manifest(manifest)
+        print(f"Slide thumbnails ready ({built} built, {reused} deduplicated, {cached} from manifest, "
+              f"{len(set(self._thumbnails.values()))} unique).")
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.thumbnail_dir, MANIFEST_FILE)
+
+    def _load_manifest(self) -> Dict[str, Dict]:
+        try:
+            with open(self._manifest_path(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self, manifest: Dict[str, Dict]) -> None:
+        tmp_path = self._manifest_path() + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self._manifest_path())
+
+    @staticmethod
+    def _settings_key() -> str:
+        # Changing the thumbnail size or quality must invalidate previously built files
+        return f"w{settings.THUMBNAIL_WIDTH}q{settings.THUMBNAIL_QUALITY}"
+
+    def get_thumbnail(self, slide_image: Optional[str]) -> Optional[bytes]:
+        """Return thumbnail bytes for a slide image path, or None if no thumbnail exists."""
+        thumbnail = self._thumbnails.get(slide_image) if slide_image else None
+        if not thumbnail:
+            return None
+
+        with self._lock:
+            data = self._cache.get(thumbnail)
+            if data is not None:
+                self._cache.move_to_end(thumbnail)
+                return data
+
+        try:
+            with open(thumbnail, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        with self._lock:
+            if thumbnail not in self._cache:
+                self._cache[thumbnail] = data
+                self._cache_size += len(data)
+                self._evict()
+        return data
+
+    def _evict(self) -> None:
+        # Always keep the most recently inserted entry, even if it alone exceeds the budget
+        while self._cache_size > self.max_bytes and len(self._cache) > 1:
+            _, data = self._cache.popitem(last=False)
+            self._cache_size -= len(data)
+
+    def _write_thumbnail(self, img, path: str) -> None:
+        thumb = img.convert("RGB")
+        if thumb.width > settings.THUMBNAIL_WIDTH:
+            height = round(thumb.height * settings.THUMBNAIL_WIDTH / thumb.width)
+            thumb = thumb.resize((settings.THUMBNAIL_WIDTH, height))
+        thumb.save(path, format="WEBP", quality=settings.THUMBNAIL_QUALITY)
+
+    @staticmethod
+    def _signature(img) -> bytes:
+        return img.convert("L").resize(SIGNATURE_SIZE).tobytes()
+
+    @staticmethod
+    def _same_slide(a: Optional[bytes], b: Optional[bytes]) -> bool:
+        if a is None or b is None or len(a) != len(b):
+            return False
+        diff = sum(abs(x - y) for x, y in zip(a, b)) / len(a)
+        return diff <= settings.SLIDE_DEDUPE_TOLERANCE
+
+    @staticmethod
+    def _file_hash(path: str) -> str:
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 16), b""):
+                digest.update(block)
+        return digest.hexdigest()
@@ -0,0 +1,79 @@
+"""
+Compare search latency of the Chroma and NumPy vector backends on lecture.json.
+
+Query embeddings are computed once up front, so the timings cover only the
+vector search itself and not the embedding call.
+
+Usage: python -m benchmarks.bench_vector_backends [lecture.json] [num_queries]
+"""
+import random
+import statistics
+import sys
+import time
+
+from dotenv import load_dotenv
+
+from config.settings import settings
+from retriever.time_index import build_where_filter
+from startup import load_and_process_data
+
+
+def summarize(name: str, timings):
+    timings = sorted(timings)
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"{name:<32} mean {statistics.mean(timings) * 1000:8.3f} ms"
+          f"   p50 {statistics.median(timings) * 1000:8.3f} ms   p95 {p95 * 1000:8.3f} ms")
+
+
+def time_queries(search, vectors, **kwargs):
+    timings = []
+    for vector in vectors:
+        started = time.perf_counter()
+        search(vector, k=settings.VECTOR_SEARCH_K, **kwargs)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main():
+    load_dotenv()
+    json_path = sys.argv[1] if len(sys.argv) > 1 else "lecture.json"
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    from retriever.retrieval import RetrieverBuilder
+
+    docs = load_and_process_data(json_path)
+    if not docs:
+        print(f"No chunks found in {json_path}.")
+        return
+
+    builder = RetrieverBuilder()
+    stores = {}
+    for backend in ("chroma", "numpy"):
+        settings.VECTOR_BACKEND = backend
+        started = time.perf_counter()
+        stores[backend] = builder.build_vector_store(docs)
+        print(f"Loaded {backend} store in {time.perf_counter() - started:.3f}s")
+
+    random.seed(0)
+    queries = [" ".join(random.choice(docs).page_content.split()[1:9]) for _ in range(num_queries)]
+    vectors = builder.embeddings.embed_documents(queries)
+
+    duration = max(float(doc.metadata["end"]) for doc in docs)
+    where = build_where_filter((0.0, duration / 4))
+
+    print(f"\n{len(docs)} documents, {num_queries} queries, k={settings.VECTOR_SEARCH_K}\n")
+    summarize("chroma", time_queries(stores["chroma"].similarity_search_by_vector, vectors))
+    summarize("numpy", time_queries(stores["numpy"].similarity_search_by_vector, vectors))
+    summarize("chroma (first quarter filter)",
+              time_queries(stores["chroma"].similarity_search_by_vector, vectors, filter=where))
+    summarize("numpy (first quarter filter)",
+              time_queries(stores["numpy"].similarity_search_by_vector, vectors, filter=where))
+
+    started = time.perf_counter()
+    stores["numpy"].batch_similarity_search_by_vector(vectors, k=settings.VECTOR_SEARCH_K)
+    batched = time.perf_counter() - started
+    print(f"{'numpy (batched, per query)':<32} mean {batched / num_queries * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+from .history import ChatHistory
+
+__all__ = ["ChatHistory"]
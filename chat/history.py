@@ -0,0 +1,83 @@
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional
+from config.settings import settings
+
+
+class ChatHistory:
+    def __init__(self, session_id: str, db_path: Optional[str] = None, max_messages: Optional[int] = None):
+        """Keep the most recent turns in memory and page older ones out to a local SQLite store."""
+        self.session_id = session_id
+        self.db_path = db_path or settings.CHAT_HISTORY_DB_PATH
+        self.max_messages = max_messages or settings.CHAT_HISTORY_MAX_MESSAGES
+        self.messages: List[Dict] = []
+        self._next_seq = 0
+
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS archived_messages (
+                    session_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    payload TEXT NOT NULL,
+                    archived_at REAL NOT NULL,
+                    PRIMARY KEY (session_id, seq)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_archived_at ON archived_messages (archived_at)")
+        self.expire()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Streamlit reruns on different threads, so open a short-lived connection per operation
+        return sqlite3.connect(self.db_path)
+
+    def append(self, message: Dict) -> Dict:
+        """Add a message, paging the oldest in-memory turns out once the cap is exceeded."""
+        message = dict(message, seq=self._next_seq)
+        self._next_seq += 1
+        self.messages.append(message)
+
+        overflow = len(self.messages) - self.max_messages
+        if overflow > 0:
+            paged_out, self.messages = self.messages[:overflow], self.messages[overflow:]
+            with self._connect() as conn:
+                now = time.time()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO archived_messages (session_id, seq, payload, archived_at) VALUES (?, ?, ?, ?)",
+                    [(self.session_id, m["seq"], json.dumps(m), now) for m in paged_out],
+                )
+        return message
+
+    def paged_out_count(self) -> int:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) FROM archived_messages WHERE session_id = ?", (self.session_id,)
+            ).fetchone()
+        return row[0]
+
+    def load_earlier(self, limit: int, offset: int = 0) -> List[Dict]:
+        """Return up to `limit` paged-out messages, skipping the `offset` most recent ones, oldest first."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT payload FROM archived_messages WHERE session_id = ? ORDER BY seq DESC LIMIT ? OFFSET ?",
+                (self.session_id, limit, offset),
+            ).fetchall()
+        return [json.loads(payload) for (payload,) in reversed(rows)]
+
+    def clear(self) -> None:
+        """Drop this session's messages, both in memory and archived."""
+        self.messages = []
+        with self._connect() as conn:
+            conn.execute("DELETE FROM archived_messages WHERE session_id = ?", (self.session_id,))
+
+    def expire(self) -> None:
+        """Delete archived messages from any session older than CHAT_HISTORY_RETENTION_HOURS."""
+        cutoff = time.time() - settings.CHAT_HISTORY_RETENTION_HOURS * 3600
+        with self._connect() as conn:
+            conn.execute("DELETE FROM archived_messages WHERE archived_at < ?", (cutoff,))
@@ -3,7 +3,61 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     CHROMA_DB_PATH: str = "./chroma_db"
+    VECTOR_BACKEND: str = "chroma"  # "chroma" or "numpy"
+    NUMPY_INDEX_PATH: str = "./numpy_index"
+    HNSW_MIN_DOCS: int = 20000
+    HNSW_M: int = 16
+    HNSW_EF_SEARCH: int = 64
     VECTOR_SEARCH_K: int = 4
+
+    # Embeddings
+    EMBEDDING_PROVIDER: str = "ollama"  # "ollama" or "onnx"
+    ONNX_MODEL_PATH: str = "./models/nomic-embed-text/onnx/model.onnx"
+    ONNX_TOKENIZER_PATH: str = "./models/nomic-embed-text/tokenizer.json"
+    ONNX_MAX_LENGTH: int = 512
+    ONNX_NUM_THREADS: int = 4
+    ONNX_MAX_BATCH_SIZE: int = 32
+    ONNX_BATCH_WAIT_MS: float = 5.0
     HYBRID_RETRIEVER_WEIGHTS: list[float] = [0.5, 0.5]
+    NEIGHBOR_WINDOW: int = 0
+    TIME_POINT_WINDOW_SECONDS: int = 60
+
+    # Slide thumbnails
+    THUMBNAIL_DIR: str = "./slide_thumbnails"
+    THUMBNAIL_WIDTH: int = 640
+    THUMBNAIL_QUALITY: int = 80
+    THUMBNAIL_CACHE_BYTES: int = 32 * 1024 * 1024
+    SLIDE_DEDUPE_TOLERANCE: float = 2.0
+
+    # Chat history
+    CHAT_HISTORY_DB_PATH: str = "./chat_history.db"
+    CHAT_HISTORY_MAX_MESSAGES: int = 20
+    CHAT_HISTORY_PAGE_SIZE: int = 10
+    CHAT_HISTORY_RETENTION_HOURS: float = 24
+
+    # Model routing
+    FAST_MODEL: str = "gemini-2.5-flash"
+    STRONG_MODEL: str = "gemini-2.5-pro"
+    COMPLEXITY_THRESHOLD: float = 0.5
+    RELEVANCE_MAX_TOKENS: int = 8
+    REWRITE_MAX_TOKENS: int = 64
+    RESEARCH_MAX_TOKENS_SHORT: int = 512
+    RESEARCH_MAX_TOKENS_LONG: int = 1024
+    RESEARCH_THINKING_BUDGET: int = 1024
+    STRONG_THINKING_BUDGET: int = 2048
+    MAX_TOKENS_RETRIES: int = 1
+    VERIFY_MAX_TOKENS: int = 128
+    MAX_RESEARCH_ATTEMPTS: int = 2
+    ROUTING_LOG_SIZE: int = 200
+
+    # Claim-level verification
+    CLAIM_MIN_WORDS: int = 4
+    CLAIM_MIN_TERMS: int = 3
+    CLAIM_CONTEXT_CHUNKS: int = 2
+    VERIFY_MAX_CONCURRENCY: int = 4
+
+    # Follow-up handling
+    REWRITE_HISTORY_TURNS: int = 4
+    CONTEXT_REUSE_THRESHOLD: float = 0.6
 
 settings = Settings()
\ No newline at end of file
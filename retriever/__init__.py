@@ -1,3 +1,16 @@
-from .retrieval import RetrieverBuilder
+import importlib
 
-__all__ = ["RetrieverBuilder"]
+# Vector store and BM25 backends are heavy imports, so load them on first access
+_EXPORTS = {
+    "RetrieverBuilder": ".retrieval",
+    "ChunkStore": ".chunk_store",
+}
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["RetrieverBuilder", "ChunkStore"]
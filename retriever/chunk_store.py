@@ -0,0 +1,32 @@
+from typing import Dict, Iterable, List, Optional
+from langchain_core.documents import Document
+
+
+class ChunkStore:
+    def __init__(self, docs: List[Document]):
+        """Resolve lecture chunks by ID so chat history only needs to keep the IDs around."""
+        self._docs = docs
+        self._by_start: Dict[float, int] = {}
+        for chunk_id, doc in enumerate(docs):
+            self._by_start.setdefault(doc.metadata.get("start"), chunk_id)
+
+    def id_for(self, doc: Document) -> Optional[int]:
+        """Return the chunk ID of a retrieved document.
+
+        Documents loaded from an older Chroma index carry no chunk_id, so fall back to their start time.
+        """
+        chunk_id = doc.metadata.get("chunk_id")
+        if chunk_id is not None:
+            return int(chunk_id)
+        return self._by_start.get(doc.metadata.get("start"))
+
+    def ids_for(self, docs: Iterable[Document]) -> List[int]:
+        return [chunk_id for chunk_id in map(self.id_for, docs) if chunk_id is not None]
+
+    def get(self, chunk_id: int) -> Optional[Document]:
+        if 0 <= chunk_id < len(self._docs):
+            return self._docs[chunk_id]
+        return None
+
+    def get_many(self, chunk_ids: Iterable[int]) -> List[Document]:
+        return [doc for doc in map(self.get, chunk_ids) if doc is not None]
@@ -0,0 +1,169 @@
+import json
+import os
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from langchain_core.documents import Document
+from config.settings import settings
+
+try:
+    import hnswlib
+    HAS_HNSW = True
+except ImportError:
+    HAS_HNSW = False
+
+MATRIX_FILE = "embeddings.npy"
+DOCS_FILE = "documents.jsonl"
+HNSW_FILE = "hnsw.bin"
+
+COMPARISONS = {
+    "$eq": np.equal,
+    "$ne": np.not_equal,
+    "$gt": np.greater,
+    "$gte": np.greater_equal,
+    "$lt": np.less,
+    "$lte": np.less_equal,
+}
+
+
+class NumpyVectorStore:
+    def __init__(self, persist_directory: str, embedding_function):
+        """In-process vector store: normalized float32 embeddings in a memory-mapped matrix, searched by dot product."""
+        self.persist_directory = persist_directory
+        self.embeddings = embedding_function
+        self.docs: List[Document] = []
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self.hnsw = None
+        self._columns: Dict[str, np.ndarray] = {}
+
+        if os.path.exists(os.path.join(persist_directory, MATRIX_FILE)):
+            self._load()
+
+    @classmethod
+    def from_documents(cls, documents: List[Document], embedding, persist_directory: str) -> "NumpyVectorStore":
+        vectors = embedding.embed_documents([doc.page_content for doc in documents])
+        matrix = cls._normalize(np.asarray(vectors, dtype=np.float32))
+
+        os.makedirs(persist_directory, exist_ok=True)
+        np.save(os.path.join(persist_directory, MATRIX_FILE), matrix)
+        with open(os.path.join(persist_directory, DOCS_FILE), "w", encoding="utf-8") as f:
+            for doc in documents:
+                f.write(json.dumps({"page_content": doc.page_content, "metadata": doc.metadata}) + "\n")
+
+        return cls(persist_directory, embedding)
+
+    def _load(self):
+        self.matrix = np.load(os.path.join(self.persist_directory, MATRIX_FILE), mmap_mode="r")
+        with open(os.path.join(self.persist_directory, DOCS_FILE), "r", encoding="utf-8") as f:
+            self.docs = [Document(**json.loads(line)) for line in f if line.strip()]
+
+        if HAS_HNSW and len(self.docs) >= settings.HNSW_MIN_DOCS:
+            self.hnsw = self._load_hnsw()
+        print(f"Loaded NumPy vector index with {len(self.docs)} documents ({'HNSW' if self.hnsw else 'exact'} search).")
+
+    def _load_hnsw(self):
+        n, dim = self.matrix.shape
+        index = hnswlib.Index(space="ip", dim=dim)
+        path = os.path.join(self.persist_directory, HNSW_FILE)
+        if os.path.exists(path):
+            index.load_index(path, max_elements=n)
+        else:
+            index.init_index(max_elements=n, ef_construction=200, M=settings.HNSW_M)
+            index.add_items(np.asarray(self.matrix), np.arange(n))
+            index.save_index(path)
+        index.set_ef(max(settings.HNSW_EF_SEARCH, settings.VECTOR_SEARCH_K))
+        return index
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def similarity_search(self, query: str, k: int = 4, filter: Optional[Dict] = None) -> List[Document]:
+        return self.similarity_search_by_vector(self.embeddings.embed_query(query), k=k, filter=filter)
+
+    def similarity_search_by_vector(self, embedding: Sequence[float], k: int = 4,
+                                    filter: Optional[Dict] = None) -> List[Document]:
+        return self._search(np.asarray([embedding], dtype=np.float32), k, filter)[0]
+
+    def batch_similarity_search(self, queries: List[str], k: int = 4,
+                                filter: Optional[Dict] = None) -> List[List[Document]]:
+        """Embed all queries in one call and score them against the corpus with a single matmul."""
+        return self.batch_similarity_search_by_vector(self.embeddings.embed_documents(queries), k=k, filter=filter)
+
+    def batch_similarity_search_by_vector(self, embeddings: Sequence[Sequence[float]], k: int = 4,
+                                          filter: Optional[Dict] = None) -> List[List[Document]]:
+        return self._search(np.asarray(embeddings, dtype=np.float32), k, filter)
+
+    def _search(self, queries: np.ndarray, k: int, filter: Optional[Dict]) -> List[List[Document]]:
+        if not self.docs:
+            return [[] for _ in queries]
+        queries = self._normalize(queries)
+        mask = self._evaluate_filter(filter) if filter else None
+
+        if self.hnsw is not None:
+            labels = self._hnsw_search(queries, k, mask)
+        else:
+            labels = self._exact_search(queries, k, mask)
+        return [[self.docs[i] for i in row] for row in labels]
+
+    def _exact_search(self, queries: np.ndarray, k: int, mask: Optional[np.ndarray]) -> List[List[int]]:
+        candidates = np.flatnonzero(mask) if mask is not None else None
+        matrix = self.matrix[candidates] if candidates is not None else self.matrix
+        if len(matrix) == 0:
+            return [[] for _ in queries]
+
+        scores = queries @ matrix.T
+        k = min(k, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, idx in zip(scores, top):
+            idx = idx[np.argsort(-row[idx])]
+            results.append((candidates[idx] if candidates is not None else idx).tolist())
+        return results
+
+    def _hnsw_search(self, queries: np.ndarray, k: int, mask: Optional[np.ndarray]) -> List[List[int]]:
+        if mask is None:
+            labels, _ = self.hnsw.knn_query(queries, k=min(k, len(self.docs)))
+            return labels.tolist()
+
+        allowed = int(mask.sum())
+        if allowed == 0:
+            return [[] for _ in queries]
+        # Narrow filters are cheaper to scan exactly than to walk the graph
+        if allowed <= settings.HNSW_MIN_DOCS:
+            return self._exact_search(queries, k, mask)
+        labels, _ = self.hnsw.knn_query(queries, k=min(k, allowed), filter=lambda label: bool(mask[label]))
+        return labels.tolist()
+
+    def _column(self, field: str) -> np.ndarray:
+        if field not in self._columns:
+            values = [doc.metadata.get(field) for doc in self.docs]
+            try:
+                self._columns[field] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            except (TypeError, ValueError):
+                self._columns[field] = np.array(values, dtype=object)
+        return self._columns[field]
+
+    def _evaluate_filter(self, where: Dict) -> np.ndarray:
+        """Evaluate the subset of Chroma `where` syntax used by the retriever as a boolean mask."""
+        mask = np.ones(len(self.docs), dtype=bool)
+        for key, condition in where.items():
+            if key == "$and":
+                for clause in condition:
+                    mask &= self._evaluate_filter(clause)
+            elif key == "$or":
+                mask &= np.logical_or.reduce([self._evaluate_filter(clause) for clause in condition])
+            elif isinstance(condition, dict):
+                column = self._column(key)
+                for op, value in condition.items():
+                    if op == "$in":
+                        mask &= np.isin(column, value)
+                    elif op == "$nin":
+                        mask &= ~np.isin(column, value)
+                    elif op in COMPARISONS:
+                        mask &= COMPARISONS[op](column, value)
+                    else:
+                        raise ValueError(f"Unsupported filter operator: {op}")
+            else:
+                mask &= self._column(key) == condition
+        return mask
@@ -0,0 +1,106 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from config.settings import settings
+
+
+class OnnxEmbeddings(Embeddings):
+    def __init__(self, model_path: Optional[str] = None, tokenizer_path: Optional[str] = None,
+                 num_threads: Optional[int] = None, max_batch_size: Optional[int] = None,
+                 batch_wait_ms: Optional[float] = None):
+        """Run nomic-embed-text in-process on CPU with ONNX Runtime, batching concurrent queries together.
+
+        Outputs are mean-pooled and L2-normalized like Ollama's embed endpoint, so indexes built
+        through Ollama can be queried with this provider.
+        """
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_path = model_path or settings.ONNX_MODEL_PATH
+        tokenizer_path = tokenizer_path or settings.ONNX_TOKENIZER_PATH
+        for path in (model_path, tokenizer_path):
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"{path} not found. See 'ONNX embeddings' in the README for how to download it.")
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = num_threads or settings.ONNX_NUM_THREADS
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(
+            model_path,
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(max_length=settings.ONNX_MAX_LENGTH)
+        self.tokenizer.enable_padding()
+
+        self.max_batch_size = max_batch_size or settings.ONNX_MAX_BATCH_SIZE
+        self.batch_wait = (batch_wait_ms if batch_wait_ms is not None else settings.ONNX_BATCH_WAIT_MS) / 1000
+
+        # Serializes inference so the total CPU threads in use never exceed intra_op_num_threads
+        self._run_lock = threading.Lock()
+        self._requests: "queue.Queue[tuple]" = queue.Queue()
+        self._worker = threading.Thread(target=self._batch_loop, name="onnx-embed-batcher", daemon=True)
+        self._worker.start()
+        print("ONNX Runtime embeddings initialized successfully.")
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = []
+        for i in range(0, len(texts), self.max_batch_size):
+            vectors.extend(self._encode(texts[i:i + self.max_batch_size]).tolist())
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        future: Future = Future()
+        self._requests.put((text, future))
+        return future.result()
+
+    def _batch_loop(self):
+        """Collect queries arriving within batch_wait of each other and embed them in one forward pass."""
+        while True:
+            batch = [self._requests.get()]
+            deadline = time.monotonic() + self.batch_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                vectors = self._encode([text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), vector in zip(batch, vectors):
+                future.set_result(vector.tolist())
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+
+        inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            inputs["token_type_ids"] = np.zeros_like(input_ids)
+
+        with self._run_lock:
+            output = self.session.run(None, inputs)[0]
+
+        if output.ndim == 3:
+            # Token embeddings: mean-pool over the non-padding positions
+            mask = attention_mask[..., None].astype(np.float32)
+            output = (output * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+
+        norms = np.linalg.norm(output, axis=1, keepdims=True)
+        return (output / np.maximum(norms, 1e-12)).astype(np.float32)
@@ -1,12 +1,9 @@
-from langchain_chroma import Chroma
-from langchain_ollama import OllamaEmbeddings
 from config.settings import settings
-import sys
+from .time_aware import TimeAwareRetriever
 import os
 
 try:
     from langchain_community.retrievers import BM25Retriever
-    from langchain.retrievers import EnsembleRetriever
     HAS_HYBRID = True
 except ImportError:
     print("Warning: Hybrid Search libraries not found. Defaulting to pure Vector Search.")
@@ -14,50 +11,64 @@ except ImportError:
 
 class RetrieverBuilder:
     def __init__(self):
-        """Initialize the retriever builder with Local Ollama embeddings."""
-        self.embeddings = OllamaEmbeddings(
-            model="nomic-embed-text" 
-        )
+        """Initialize the retriever builder with the embedding provider selected by settings.EMBEDDING_PROVIDER."""
+        if settings.EMBEDDING_PROVIDER == "onnx":
+            from .onnx_embeddings import OnnxEmbeddings
+            self.embeddings = OnnxEmbeddings()
+        elif settings.EMBEDDING_PROVIDER == "ollama":
+            from langchain_ollama import OllamaEmbeddings
+            self.embeddings = OllamaEmbeddings(
+                model="nomic-embed-text" 
+            )
+        else:
+            raise ValueError(f"Unknown EMBEDDING_PROVIDER: {settings.EMBEDDING_PROVIDER}")
 
-    def build_hybrid_retriever(self, docs):
-        """Build a retriever (Vector-only fallback if Hybrid fails)."""
-    
-        if os.path.exists(settings.CHROMA_DB_PATH) and os.listdir(settings.CHROMA_DB_PATH):
+    def build_vector_store(self, docs):
+        """Load or create the vector store for the backend selected by settings.VECTOR_BACKEND."""
+        if settings.VECTOR_BACKEND == "numpy":
+            from .numpy_store import NumpyVectorStore as store_cls
+            persist_directory = settings.NUMPY_INDEX_PATH
+        elif settings.VECTOR_BACKEND == "chroma":
+            from langchain_chroma import Chroma as store_cls
+            persist_directory = settings.CHROMA_DB_PATH
+        else:
+            raise ValueError(f"Unknown VECTOR_BACKEND: {settings.VECTOR_BACKEND}")
+
+        if os.path.exists(persist_directory) and os.listdir(persist_directory):
             print("✅ Existing database found. Loading from disk...")
-            vector_store = Chroma(
-                persist_directory=settings.CHROMA_DB_PATH,
+            return store_cls(
+                persist_directory=persist_directory,
                 embedding_function=self.embeddings
             )
-        else:
-            print(f"⚠️ No database found. Creating Vector Store with {len(docs)} documents...")
-            try:
-                vector_store = Chroma.from_documents(
-                    documents=docs,
-                    embedding=self.embeddings,
-                    persist_directory=settings.CHROMA_DB_PATH
-                )
-            except Exception as e:
-                print(f"CRITICAL ERROR: Could not connect to Ollama. Is 'ollama serve' running?")
-                print(f"Details: {e}")
-                sys.exit(1)
-        
-        vector_retriever = vector_store.as_retriever(
-            search_kwargs={"k": settings.VECTOR_SEARCH_K}
-        )
+
+        print(f"⚠️ No database found. Creating Vector Store with {len(docs)} documents...")
+        try:
+            return store_cls.from_documents(
+                documents=docs,
+                embedding=self.embeddings,
+                persist_directory=persist_directory
+            )
+        except Exception as e:
+            if settings.EMBEDDING_PROVIDER == "ollama":
+                raise RuntimeError(
+                    "Could not connect to Ollama. Is 'ollama serve' running? "
+                    "Set EMBEDDING_PROVIDER=onnx to embed in-process instead."
+                ) from e
+            raise RuntimeError(f"Could not build the vector store: {e}") from e
+
+    def build_hybrid_retriever(self, docs):
+        """Build a time-aware retriever (Vector-only fallback if Hybrid fails)."""
+        vector_store = self.build_vector_store(docs)
 
         # hybrid search
         if HAS_HYBRID:
             try:
                 print("Building Hybrid Retriever (BM25 + Vector)...")
                 bm25_retriever = BM25Retriever.from_documents(docs)
-                hybrid_retriever = EnsembleRetriever(
-                    retrievers=[bm25_retriever, vector_retriever],
-                    weights=settings.HYBRID_RETRIEVER_WEIGHTS
-                )
-                return hybrid_retriever
+                return TimeAwareRetriever(vector_store, docs, bm25_retriever=bm25_retriever)
             except Exception as e:
                 print(f"Hybrid build failed ({e}). Fallback to Vector Search.")
-                return vector_retriever
+                return TimeAwareRetriever(vector_store, docs)
 
         print("🔹 Using Standard Vector Retriever.")
-        return vector_retriever
\ No newline at end of file
+        return TimeAwareRetriever(vector_store, docs)
\ No newline at end of file
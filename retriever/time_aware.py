@@ -0,0 +1,97 @@
+import heapq
+from collections import defaultdict
+from typing import List, Optional, Sequence, Tuple
+from langchain_core.documents import Document
+from config.settings import settings
+from .time_index import IntervalIndex, TimeRange, build_where_filter, parse_time_range
+
+# Same reciprocal rank fusion constant as LangChain's EnsembleRetriever
+RRF_C = 60
+
+
+class TimeAwareRetriever:
+    def __init__(self, vector_store, docs: List[Document], bm25_retriever=None,
+                 weights: Optional[Sequence[float]] = None, k: Optional[int] = None,
+                 neighbor_window: Optional[int] = None):
+        """Hybrid (BM25 + vector) retriever that pushes lecture time filters down into both indexes."""
+        self.vector_store = vector_store
+        self.docs = docs
+        self.bm25_retriever = bm25_retriever
+        self.weights = list(weights or settings.HYBRID_RETRIEVER_WEIGHTS)
+        self.k = k or settings.VECTOR_SEARCH_K
+        self.neighbor_window = settings.NEIGHBOR_WINDOW if neighbor_window is None else neighbor_window
+        self.index = IntervalIndex(docs)
+
+    def invoke(self, query: str, time_range: Optional[TimeRange] = None,
+               neighbor_window: Optional[int] = None) -> List[Document]:
+        if time_range is None:
+            time_range = parse_time_range(query, duration=self.index.duration)
+
+        candidates = None
+        if time_range:
+            candidates = self.index.in_range(*time_range)
+            print(f"Time filter {time_range[0]:.0f}s-{time_range[1]:.0f}s matches {len(candidates)} chunks.")
+            if not candidates:
+                # A misparsed or out-of-bounds range shouldn't turn the whole question into NO_MATCH
+                print("No chunks in that time range. Searching the whole lecture instead.")
+                time_range, candidates = None, None
+
+        ranked: List[Tuple[List[Document], float]] = []
+        if self.bm25_retriever is not None:
+            bm25_weight, vector_weight = self.weights
+            ranked.append((self._sparse_search(query, candidates), bm25_weight))
+        else:
+            vector_weight = 1.0
+        ranked.append((self._vector_search(query, time_range), vector_weight))
+
+        results = self._fuse(ranked)
+
+        window = self.neighbor_window if neighbor_window is None else neighbor_window
+        if window > 0:
+            results = self._expand(results, window)
+        return results
+
+    def _vector_search(self, query: str, time_range: Optional[TimeRange]) -> List[Document]:
+        where = build_where_filter(time_range) if time_range else None
+        try:
+            return self.vector_store.similarity_search(query, k=self.k, filter=where)
+        except Exception as e:
+            if where is None:
+                raise
+            # Older indexes may store start/end as strings, which Chroma can't range-filter
+            print(f"Filtered vector search failed ({e}). Filtering results in memory.")
+            start, end = time_range
+            docs = self.vector_store.similarity_search(query, k=self.k * 4)
+            return [
+                doc for doc in docs
+                if float(doc.metadata.get("end", 0)) > start and float(doc.metadata.get("start", 0)) < end
+            ][:self.k]
+
+    def _sparse_search(self, query: str, candidates: Optional[List[int]]) -> List[Document]:
+        doc_ids = candidates if candidates is not None else list(range(len(self.docs)))
+        tokens = self.bm25_retriever.preprocess_func(query)
+        # Only score the candidate chunks instead of the whole corpus
+        scores = self.bm25_retriever.vectorizer.get_batch_scores(tokens, doc_ids)
+        top = heapq.nlargest(self.k, zip(scores, doc_ids), key=lambda pair: pair[0])
+        return [self.docs[doc_id] for _, doc_id in top]
+
+    def _fuse(self, ranked: List[Tuple[List[Document], float]]) -> List[Document]:
+        scores = defaultdict(float)
+        unique = {}
+        for docs, weight in ranked:
+            for rank, doc in enumerate(docs):
+                scores[doc.page_content] += weight / (rank + 1 + RRF_C)
+                unique.setdefault(doc.page_content, doc)
+        return [unique[key] for key in sorted(scores, key=scores.get, reverse=True)]
+
+    def _expand(self, results: List[Document], window: int) -> List[Document]:
+        """Append the chunks surrounding each hit so the researcher sees contiguous context."""
+        seen = {doc.page_content for doc in results}
+        extra = []
+        for doc in results:
+            for neighbor in self.index.neighbors(doc, window):
+                if neighbor.page_content not in seen:
+                    seen.add(neighbor.page_content)
+                    extra.append(neighbor)
+        extra.sort(key=lambda doc: float(doc.metadata.get("start", 0)))
+        return results + extra
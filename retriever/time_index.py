@@ -0,0 +1,139 @@
+import math
+import re
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
+from langchain_core.documents import Document
+from config.settings import settings
+
+TimeRange = Tuple[float, float]
+
+VALUE = r"\d{1,2}:\d{2}(?::\d{2})?|\d+(?:\.\d+)?"
+UNIT = r"hours?|hrs?|minutes?|mins?|seconds?|secs?"
+# End of a unit word; \b alone would accept "second-order" as "second"
+UNIT_END = r"(?![\w-])"
+# A point in the lecture: "12:30", "20 minutes", "minute 20"
+POINT = rf"(?:(minute|min|hour|second)\s+)?({VALUE})(?:\s*({UNIT}){UNIT_END})?"
+
+RANGE_RE = re.compile(rf"\b(?:between|from)\s+{POINT}\s*(?:and|to|until|-)\s*{POINT}")
+FIRST_RE = re.compile(rf"\bfirst\s+(?:({VALUE})\s*)?({UNIT}){UNIT_END}")
+# "in the past 2 hours" means the end of the lecture, like "last"
+LAST_RE = re.compile(rf"\b(?:last|past)\s+(?:({VALUE})\s*)?({UNIT}){UNIT_END}")
+BOUND_RE = re.compile(rf"\b(before|until|after|since)\s+{POINT}")
+AROUND_RE = re.compile(rf"\b(?:at|around)\s+{POINT}")
+
+
+def _to_seconds(value: str, unit: Optional[str]) -> Optional[float]:
+    if ":" in value:
+        seconds = 0.0
+        for part in value.split(":"):
+            seconds = seconds * 60 + int(part)
+        return seconds
+    if not unit:
+        # Bare numbers ("after 2 examples") are not time references
+        return None
+    amount = float(value)
+    if unit.startswith("h"):
+        return amount * 3600
+    if unit.startswith("m"):
+        return amount * 60
+    return amount
+
+
+def parse_time_range(query: str, duration: Optional[float] = None) -> Optional[TimeRange]:
+    """Extract a lecture time range (in seconds) from phrases like "in the first 30 minutes"."""
+    text = query.lower()
+
+    match = RANGE_RE.search(text)
+    if match:
+        prefix1, value1, unit1, prefix2, value2, unit2 = match.groups()
+        start = _to_seconds(value1, unit1 or prefix1 or unit2 or prefix2)
+        end = _to_seconds(value2, unit2 or prefix2 or unit1 or prefix1)
+        if start is not None and end is not None and start < end:
+            return start, end
+
+    match = FIRST_RE.search(text)
+    if match:
+        return 0.0, _to_seconds(match.group(1) or "1", match.group(2))
+
+    match = LAST_RE.search(text)
+    if match and duration:
+        return max(0.0, duration - _to_seconds(match.group(1) or "1", match.group(2))), math.inf
+
+    match = BOUND_RE.search(text)
+    if match:
+        direction, prefix, value, unit = match.groups()
+        point = _to_seconds(value, unit or prefix)
+        if point is not None:
+            return (0.0, point) if direction in ("before", "until") else (point, math.inf)
+
+    match = AROUND_RE.search(text)
+    if match:
+        prefix, value, unit = match.groups()
+        point = _to_seconds(value, unit or prefix)
+        if point is not None:
+            window = settings.TIME_POINT_WINDOW_SECONDS
+            return max(0.0, point - window), point + window
+
+    return None
+
+
+def mentions_time_range(query: str) -> bool:
+    """True if the query scopes itself to part of the lecture, even when the lecture length is unknown."""
+    return parse_time_range(query) is not None or LAST_RE.search(query.lower()) is not None
+
+
+def build_where_filter(time_range: TimeRange) -> Optional[Dict]:
+    """Translate a time range into a Chroma `where` clause matching chunks that overlap it."""
+    start, end = time_range
+    clauses = []
+    if start > 0:
+        clauses.append({"end": {"$gt": start}})
+    if not math.isinf(end):
+        clauses.append({"start": {"$lt": end}})
+
+    if not clauses:
+        return None
+    if len(clauses) == 1:
+        return clauses[0]
+    return {"$and": clauses}
+
+
+class IntervalIndex:
+    def __init__(self, docs: List[Document]):
+        """Chunks sorted by start time, for O(log n) range lookups and neighbor windows."""
+        self.docs = docs
+        self.order = sorted(range(len(docs)), key=lambda i: float(docs[i].metadata.get("start", 0)))
+        self.starts = [float(docs[i].metadata.get("start", 0)) for i in self.order]
+        self.ends = [float(docs[i].metadata.get("end", 0)) for i in self.order]
+
+        # Running max keeps the end column sorted even if windows overlap
+        self._max_ends = []
+        running = -math.inf
+        for end in self.ends:
+            running = max(running, end)
+            self._max_ends.append(running)
+
+    @property
+    def duration(self) -> float:
+        return self._max_ends[-1] if self._max_ends else 0.0
+
+    def in_range(self, start: float, end: float) -> List[int]:
+        """Return indices (into the original docs list) of chunks overlapping [start, end)."""
+        lo = bisect_right(self._max_ends, start)
+        hi = bisect_left(self.starts, end)
+        return [self.order[p] for p in range(lo, hi) if self.ends[p] > start]
+
+    def position(self, doc: Document) -> Optional[int]:
+        start = float(doc.metadata.get("start", 0))
+        p = bisect_left(self.starts, start)
+        if p < len(self.starts) and self.starts[p] == start:
+            return p
+        return None
+
+    def neighbors(self, doc: Document, window: int) -> List[Document]:
+        """Return up to `window` chunks on each side of `doc`, in time order."""
+        p = self.position(doc)
+        if p is None:
+            return []
+        lo, hi = max(0, p - window), min(len(self.order), p + window + 1)
+        return [self.docs[self.order[j]] for j in range(lo, hi) if j != p]
@@ -0,0 +1,119 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+def load_and_process_data(json_path: str) -> List:
+    """
+    Loads lecture.json and converts it into LangChain Documents.
+    Combines transcript and slide text for better retrieval context.
+    """
+    from langchain_core.documents import Document
+
+    if not os.path.exists(json_path):
+        return []
+
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    documents = []
+    for chunk_id, chunk in enumerate(data):
+        content = f"Transcript: {chunk['transcript']}\nSlide Content: {chunk['slide_text']}"
+
+        metadata = {
+            "chunk_id": chunk_id,
+            "start": chunk['start'],
+            "end": chunk['end'],
+            "slide_image": chunk['slide_image']
+        }
+
+        doc = Document(page_content=content, metadata=metadata)
+        documents.append(doc)
+
+    return documents
+
+
+class SystemLoader:
+    def __init__(self, json_path: str):
+        """Builds the retriever, agents and slide assets on a background thread so the UI can render meanwhile."""
+        self.json_path = json_path
+        self.status = "pending"
+        self.stage: Optional[str] = None
+        self.error: Optional[str] = None
+        self.timings: Dict[str, float] = {}
+
+        self.retriever = None
+        self.workflow_agent = None
+        self.workflow_graph = None
+        self.asset_cache = None
+        self.chunk_store = None
+
+        self._thread = threading.Thread(target=self._run, name="system-loader", daemon=True)
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    @property
+    def failed(self) -> bool:
+        return self.status == "failed"
+
+    @property
+    def cold_start_seconds(self) -> float:
+        return sum(self.timings.values())
+
+    def start(self) -> "SystemLoader":
+        if self.status == "pending":
+            self.status = "loading"
+            self._thread.start()
+        return self
+
+    @contextmanager
+    def _stage(self, name: str):
+        self.stage = name
+        started = time.perf_counter()
+        yield
+        self.timings[name] = time.perf_counter() - started
+
+    def _run(self):
+        try:
+            with self._stage("documents"):
+                docs = load_and_process_data(self.json_path)
+                if not docs:
+                    raise RuntimeError(f"No chunks found in {self.json_path}.")
+
+                from retriever.chunk_store import ChunkStore
+                self.chunk_store = ChunkStore(docs)
+
+            with self._stage("thumbnails"):
+                from assets import SlideAssetCache
+                self.asset_cache = SlideAssetCache()
+                self.asset_cache.build_thumbnails(docs)
+
+            with self._stage("retriever"):
+                from retriever.retrieval import RetrieverBuilder
+                self.retriever = RetrieverBuilder().build_hybrid_retriever(docs) # if bm25 fails, falls back to vector only
+
+            with self._stage("agents"):
+                from agents.workflow import AgentWorkflow
+                self.workflow_agent = AgentWorkflow()
+                self.workflow_graph = self.workflow_agent.create_workflow()
+
+            # First query otherwise pays for the embedder model load and the Gemini TLS handshakes
+            with self._stage("warm-up"):
+                self.retriever.invoke("warm-up")
+                self.workflow_agent.warm_up()
+
+        except Exception as e:
+            print(f"System initialization failed: {e}")
+            self.error = str(e)
+            self.status = "failed"
+            return
+
+        self.stage = None
+        self.status = "ready"
+        breakdown = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.timings.items())
+        print(f"Cold start finished in {self.cold_start_seconds:.2f}s ({breakdown}).")